@@ -1,4 +1,41 @@
-def VO2max_Brigham_Young(weight_kg, time_min, HR, gender):
+from functools import lru_cache
+import numpy as np
+try:
+    from vo2max_kernels import vo2max_by as _vo2max_by_aot
+except ImportError:  # see build_vo2max_kernels.py
+    _vo2max_by_aot = None
+try:
+    from numba import vectorize
+except ImportError:  # numba is optional, fall back to numpy
+    vectorize = None
+
+
+# constant term of the formula indexed by gender (woman = 0, man = 1)
+_BY_CONST = np.array([100.5, 108.844])
+
+
+def _VO2max_Brigham_Young_kernel(weight_kg, time_min, HR, const):
+    return const - ((0.1636 * weight_kg) + (1.438 * time_min) + (0.1928 * HR))
+
+
+@lru_cache(maxsize=None)
+def _VO2max_Brigham_Young_ufunc():
+    # compiled on the first array call instead of at import
+    return vectorize(['float32(float32, float32, float32, float32)',
+                      'float64(float64, float64, float64, float64)'],
+                     cache=True)(_VO2max_Brigham_Young_kernel)
+
+
+@lru_cache(maxsize=1024)
+def _VO2max_Brigham_Young_scalar(weight_kg, time_min, HR, gender):
+    if _vo2max_by_aot is not None:
+        return _vo2max_by_aot(weight_kg, time_min, HR, gender)
+    return _VO2max_Brigham_Young_kernel(weight_kg, time_min, HR,
+                                        float(_BY_CONST[gender]))
+
+
+def VO2max_Brigham_Young(weight_kg, time_min, HR, gender,
+                         dtype=np.float64):
     """
     Brigham Young University Jog Test
 
@@ -25,11 +62,33 @@ def VO2max_Brigham_Young(weight_kg, time_min, HR, gender):
     gender: woman = 0
             man = 1
 
+    The inputs can be scalars or arrays (one value per subject); they are
+    broadcast against each other so a batch is evaluated in a single call.
+    Scalar calls are memoized. When numba is available array inputs go
+    through a compiled ufunc with float32 and float64 loops.
+
+    dtype: floating type of the computation for array inputs, np.float32
+           halves the memory traffic when scoring large batches
+
     10/11/2020 Wing-Fai Thi
     """
-    f = (0.1636 * weight_kg) + (1.438 * time_min) + (0.1928 * HR)
-    VO2max = (1 - gender) * (100.5 - f) + gender * (108.844 - f)
-    return VO2max
+    if np.isscalar(weight_kg) and np.isscalar(time_min) and \
+            np.isscalar(HR) and np.isscalar(gender):
+        if gender not in (0, 1):
+            raise ValueError('gender should be 0 (woman) or 1 (man)')
+        return _VO2max_Brigham_Young_scalar(float(weight_kg), float(time_min),
+                                            float(HR), int(gender))
+    weight_kg = np.asarray(weight_kg, dtype=dtype)
+    time_min = np.asarray(time_min, dtype=dtype)
+    HR = np.asarray(HR, dtype=dtype)
+    gender = np.asarray(gender)
+    if not np.isin(gender, (0, 1)).all():
+        raise ValueError('gender should be 0 (woman) or 1 (man)')
+    const = _BY_CONST.astype(dtype)[gender.astype(np.intp)]
+    if vectorize is not None:
+        return _VO2max_Brigham_Young_ufunc()(weight_kg, time_min, HR, const)
+    VO2max = _VO2max_Brigham_Young_kernel(weight_kg, time_min, HR, const)
+    return VO2max[()]
 
 
 if __name__ == "__main__":
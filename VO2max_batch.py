@@ -0,0 +1,95 @@
+"""
+Batch evaluation of the VO2max field tests
+
+Copyright (C) 2024  Wing-Fai Thi
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+The subjects are stored column-wise, one array per quantity, and each
+subject is assigned the test it performed:
+
+    METHOD_BY       Brigham Young University jog test
+                    uses weight, time, HR, gender
+    METHOD_ROCKPORT Rockport walk test
+                    uses age, weight, time, HR, gender
+    METHOD_SUBMAX   NTNU submaximal treadmill test
+                    uses incl, speed, weight, HR, age
+"""
+
+import numpy as np
+from VO2max_Brigham_Young import VO2max_Brigham_Young
+from VO2max_Rockport import VO2max_Rockport
+from VO2max_ntnu import VO2max_submaximal
+
+METHOD_BY = 0
+METHOD_ROCKPORT = 1
+METHOD_SUBMAX = 2
+
+
+def VO2max_batch(data, dtype=np.float64):
+    """
+    Estimate the VO2max of many subjects at once
+
+    data: mapping of column name to array (a dict or a pandas DataFrame)
+        'method' is required, the other columns (weight, age, time, HR,
+        gender, incl, speed) are only needed by the methods present
+
+    dtype: floating type of the computation, np.float32 halves the memory
+           traffic for large batches
+
+    Each method is evaluated once on the subjects selected by its mask and
+    the results are scattered into the output. Subjects with an unknown
+    method get nan.
+
+    Example
+    -------
+    >>> import numpy as np
+    >>> from VO2max_batch import *
+    >>> data = {'method': np.array([METHOD_BY, METHOD_ROCKPORT]),
+    ...         'weight': np.array([61., 61.]),
+    ...         'age': np.array([48., 48.]),
+    ...         'time': np.array([10.8, 20.]),
+    ...         'HR': np.array([165.6, 138.]),
+    ...         'gender': np.array([1, 1])}
+    >>> np.round(VO2max_batch(data), 4)
+    array([51.4063, 31.6022])
+    """
+    method = np.asarray(data['method'])
+    VO2max = np.full(method.shape, np.nan, dtype=dtype)
+
+    def column(name, mask):
+        return np.asarray(data[name], dtype=dtype)[mask]
+
+    m = method == METHOD_BY
+    if m.any():
+        VO2max[m] = VO2max_Brigham_Young(column('weight', m),
+                                         column('time', m),
+                                         column('HR', m),
+                                         column('gender', m), dtype=dtype)
+    m = method == METHOD_ROCKPORT
+    if m.any():
+        VO2max[m] = VO2max_Rockport(column('age', m), column('weight', m),
+                                    column('time', m), column('HR', m),
+                                    column('gender', m), dtype=dtype)
+    m = method == METHOD_SUBMAX
+    if m.any():
+        VO2max[m] = VO2max_submaximal(column('incl', m), column('speed', m),
+                                      column('weight', m), column('HR', m),
+                                      column('age', m), dtype=dtype)
+    return VO2max
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod(verbose=True, optionflags=doctest.ELLIPSIS)
@@ -40,44 +40,120 @@
 
 """
 
+from functools import lru_cache
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_pdf import PdfPages
-
-
-def VO2max_submaximal(incl, speed, weight, HR, age):
+try:
+    import numexpr as ne
+except ImportError:  # numexpr is optional, fall back to plain numpy
+    ne = None
+try:
+    from numba import vectorize
+except ImportError:  # numba is optional, fall back to numexpr / numpy
+    vectorize = None
+try:
+    from vo2max_kernels import vo2max_submaximal as _vo2max_submaximal_aot
+except ImportError:  # see build_vo2max_kernels.py
+    _vo2max_submaximal_aot = None
+
+
+def _VO2max_submaximal_kernel(incl, speed, weight, HR, age):
+    return 35.25 + 1.276 * incl + 6.402 * speed - 0.196 * weight -\
+        27.65 * HR / (215.336 - 0.73 * age)
+
+
+@lru_cache(maxsize=None)
+def _VO2max_submaximal_ufunc():
+    # compiled on the first array call instead of at import
+    return vectorize(['float32(float32, float32, float32, float32, float32)',
+                      'float64(float64, float64, float64, float64, float64)'],
+                     cache=True)(_VO2max_submaximal_kernel)
+
+
+def VO2max_submaximal(incl, speed, weight, HR, age, dtype=np.float64):
     """
     Predicting VO2peak from submaximal treadmill performance
 
     VO2max_submaximal(0.,7.5,63.,0.8*182.,47.)
     Objectiv: 7.5 km/h, flat surface, 80%, 10 min
+
+    All the inputs are broadcast against each other. When numba is available
+    the formula is a compiled ufunc with float32 and float64 loops,
+    otherwise when numexpr is available the whole expression is evaluated in
+    a single pass over the inputs. Scalar float64 inputs use the
+    ahead-of-time compiled kernel when it has been built with
+    build_vo2max_kernels.py.
+
+    dtype: floating type of the computation, np.float32 halves the memory
+           traffic when scoring large batches
     """
-    VO2max = 35.25 + (1.276 * incl) + (6.402 * speed) - (0.196 * weight) -\
+    if _vo2max_submaximal_aot is not None and \
+            np.dtype(dtype) == np.float64 and \
+            np.isscalar(incl) and np.isscalar(speed) and \
+            np.isscalar(weight) and np.isscalar(HR) and np.isscalar(age):
+        return _vo2max_submaximal_aot(incl, speed, weight, HR, age)
+    incl = np.asarray(incl, dtype=dtype)
+    speed = np.asarray(speed, dtype=dtype)
+    weight = np.asarray(weight, dtype=dtype)
+    HR = np.asarray(HR, dtype=dtype)
+    age = np.asarray(age, dtype=dtype)
+    if vectorize is not None:
+        return _VO2max_submaximal_ufunc()(incl, speed, weight, HR, age)
+    if ne is not None:
+        VO2max = ne.evaluate('35.25 + 1.276 * incl + 6.402 * speed'
+                             ' - 0.196 * weight'
+                             ' - 27.65 * HR / (215.336 - 0.73 * age)',
+                             local_dict={'incl': incl, 'speed': speed,
+                                         'weight': weight, 'HR': HR,
+                                         'age': age})
+        return VO2max.astype(dtype, copy=False)[()]
+    # fold the terms which do not depend on speed into a single offset so
+    # that only one pass is made over the speed array
+    offset = 35.25 + (1.276 * incl) - (0.196 * weight) -\
         (27.65 * HR / (215.336 - 0.73 * age))
-    return VO2max
+    VO2max = np.multiply(speed, 6.402)
+    if np.ndim(offset) == 0:
+        VO2max += offset
+    else:
+        VO2max = VO2max + offset
+    return VO2max[()]
 
 
 if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_pdf import PdfPages
     # Example
     pdf_filename = 'VO2max_ntnu.pdf'
     pp = PdfPages(pdf_filename)
-    incl_range = [0., 5., 10., 15., 20., 25.]  # percentage
+    incl_range = np.array([0., 5., 10., 15., 20., 25.])  # percentage
     age = 25.  # age in year
     weight = 63  # in kg
     speed = np.array([3.0, 3.5, 4.0, 4.5, 5.0, 5.5, 6.0, 6.5, 7.0])  # km/h
     HRmax = 196.
     HR_range = np.array([0.65, 0.700001, 0.75, 0.8, 0.85]) * HRmax
-    for incl in incl_range:
-        for HR in HR_range:
-            VO2max = VO2max_submaximal(incl, speed, weight, HR, age)
-            plt.plot(speed, VO2max,
-                     label=str(int(100. * HR / HRmax)) + '% HR$_{\mathrm{max}}$')
-        plt.xlabel('Treadmill speed [km/h]')
-        plt.ylabel('VO2$_{\mathrm{max}}$')
-        plt.title(str(weight) + ' kg, ' + str(int(age)) + 'yrs, incl='+str(int(incl))+' %')
-        plt.legend()
-        plt.grid(True)
-        plt.savefig(pp, format='pdf')
-        plt.clf()
-    pp.close()
+    # evaluate the whole (incl, HR, speed) grid in one broadcast call
+    VO2max_grid = VO2max_submaximal(incl_range[:, None, None],
+                                    speed[None, None, :], weight,
+                                    HR_range[None, :, None], age)
+    # one figure is reused for all the pages, only the curves and the
+    # title change from one inclination to the next
+    fig, ax = plt.subplots()
+    lines = [ax.plot(speed, VO2max_grid[0, j],
+                     label=str(int(100. * HR / HRmax)) +
+                     '% HR$_{\mathrm{max}}$')[0]
+             for j, HR in enumerate(HR_range)]
+    ax.set_xlabel('Treadmill speed [km/h]')
+    ax.set_ylabel('VO2$_{\mathrm{max}}$')
+    ax.legend()
+    ax.grid(True)
+    # the pages are small, skip the zlib compression of each page stream
+    with plt.rc_context({'pdf.compression': 0}):
+        for i, incl in enumerate(incl_range):
+            for j, line in enumerate(lines):
+                line.set_ydata(VO2max_grid[i, j])
+            ax.relim()
+            ax.autoscale_view()
+            ax.set_title(str(weight) + ' kg, ' + str(int(age)) + 'yrs, incl='+str(int(incl))+' %')
+            pp.savefig(fig, bbox_inches=None)
+        pp.close()
+    plt.close(fig)
 
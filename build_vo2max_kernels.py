@@ -0,0 +1,57 @@
+"""
+Ahead-of-time compilation of the VO2max formulas with numba
+
+    python build_vo2max_kernels.py
+
+writes the C extension vo2max_kernels next to this file. When it can be
+imported, VO2max_Brigham_Young, VO2max_Rockport and VO2max_submaximal use
+it for scalar inputs, which avoids the numba JIT warm-up at run time.
+
+Copyright (C) 2024  Wing-Fai Thi
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import os
+from numba.pycc import CC
+
+cc = CC('vo2max_kernels')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+# gender (woman = 0, man = 1) enters the constant term arithmetically so the
+# kernels never index memory with an unchecked value, the public functions
+# reject any other gender before calling them
+
+
+@cc.export('vo2max_by', 'f8(f8, f8, f8, i4)')
+def vo2max_by(weight_kg, time_min, HR, gender):
+    return 100.5 + 8.344 * gender -\
+        ((0.1636 * weight_kg) + (1.438 * time_min) + (0.1928 * HR))
+
+
+@cc.export('vo2max_rockport', 'f8(f8, f8, f8, f8, i4)')
+def vo2max_rockport(age, weight_kg, time_min, HR, gender):
+    weight_lbs = weight_kg * (1. / 2.2)
+    return 132.853 + 6.315 * gender - (0.0769 * weight_lbs) -\
+        (0.3877 * age) - (3.2648 * time_min) - (0.156 * HR)
+
+
+@cc.export('vo2max_submaximal', 'f8(f8, f8, f8, f8, f8)')
+def vo2max_submaximal(incl, speed, weight, HR, age):
+    return 35.25 + 1.276 * incl + 6.402 * speed - 0.196 * weight -\
+        27.65 * HR / (215.336 - 0.73 * age)
+
+
+if __name__ == "__main__":
+    cc.compile()
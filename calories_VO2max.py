@@ -1,6 +1,4 @@
 import numpy as np
-from scipy.interpolate import interp1d
-import matplotlib.pyplot as plt
 
 
 """
@@ -55,13 +53,27 @@ VT2 ventilatory threshold aka anadrobic threshold
 Lactate threshold: 85% HRmax, 75% VO2max
 - exercise intensity at which lactate concentration begins to
 increase exponentially
+
+The plots (MyZone_VO2_plot, energy_expenditure, plot_threshold) are in
+calories_VO2max_plots. They can still be reached as attributes of this
+module, e.g. calories_VO2max.MyZone_VO2_plot, but a star import of this
+module no longer provides them.
 """
 
-colo = ['blue', 'silver', 'darkgoldenrod', 'darkgreen',
-        'darkmagenta', 'red', 'darkorange', 'gold', 'darkorchid',
-        'aqua', 'cadetblue', 'darkolivegreen', 'burlywood', 'chartreuse',
-        'chocolate', 'coral', 'cornflowerblue', 'black', 'darkkhaki', 'pink',
-        'moccasin', 'limegreen']
+_KJ_TO_KCAL = 0.239006
+
+# 1 / 0.6463 / 100. / 200. for calories_kg_HR
+_CAL_KG_HR_FACTOR = 1. / (0.6463 * 100. * 200.)
+
+# anabolic_threshold_Fair adjustment for the levels 0 to 3
+_ANABOLIC_ADJUST = (-10., 0., 5., 10.)
+
+# linear fits of the MET_bicycle table, the data never change so the fits
+# are done once at import
+_MET_SLOPE, _MET_INTERCEPT = np.polyfit([10., 15., 20., 25., 30.],
+                                        [4.8, 5.9, 7.1, 8.4, 9.8], 1)
+_W_SLOPE, _W_INTERCEPT = np.polyfit([10., 15., 20., 25., 30.],
+                                    [84., 103., 124., 147., 172.], 1)
 
 
 def Cal_min_from_MET(MET, weight_kg):
@@ -89,6 +101,8 @@ def MET_bicycle(speed_kmh, weight_kg):
     25     8.4    147
     30     9.8    172
 
+    speed_kmh can be a scalar or an array
+
     Example
     -------
     >>> from calories_VO2max import *
@@ -100,13 +114,8 @@ def MET_bicycle(speed_kmh, weight_kg):
     ...       weight_kg))
     Bicycle speed: 25.0 weight: 50.0 Cal/min: 7.393750000000001
     """
-    speed = np.array([10., 15., 20., 25., 30.])
-    METs = np.array([4.8, 5.9, 7.1, 8.4, 9.8])
-    Watts_per_kg = np.array([84., 103., 124., 147., 172.])
-    Watts_per_kg = Watts_per_kg / weight_kg
-    coeff1 = np.polyfit(speed, METs, 1.)
-    coeff2 = np.polyfit(speed, Watts_per_kg, 1.)
-    return coeff1[0] * speed_kmh + coeff1[1], coeff2[0] * speed_kmh + coeff2[1]
+    return _MET_SLOPE * speed_kmh + _MET_INTERCEPT, \
+        (_W_SLOPE * speed_kmh + _W_INTERCEPT) / weight_kg
 
 
 def VO2_bicycle(Power_Watts, weight_kg):
@@ -312,20 +321,21 @@ def energy_expenditure_kg(gender, age, weight, VO2max, heart_rate):
     >>> EE_VO2max[0]
     7.454238630999999
     """
-    if isinstance(heart_rate, list):
-        heart_rate = np.array(heart_rate)
-    if isinstance(VO2max, list):
-        VO2max = np.array(VO2max)
-    EE_VO2max = -59.3954 + gender * (-36.3781 + 0.271 * age + 0.394 * weight +
-                                     0.404 * VO2max + 0.634 * heart_rate)\
-        + (1. - gender) * (0.274 * age + 0.103 * weight + 0.380 * VO2max +
-                           0.450 * heart_rate)
-    EE = gender * (-55.0969 + 0.6309 * heart_rate + 0.1988 * weight +
-                   0.2017 * age)\
-        + (1. - gender) * (-20.4022 + 0.4472 * heart_rate -
-                           0.1263 * weight + 0.074 * age)
-    KJ_to_kcal = 0.239006
-    return EE_VO2max * KJ_to_kcal, EE * KJ_to_kcal
+    heart_rate = np.asarray(heart_rate, dtype=np.float64)
+    VO2max = np.asarray(VO2max, dtype=np.float64)
+    # both formulas are affine in heart_rate: the intercepts and slopes only
+    # depend on the subject, compute them first and make a single pass over
+    # the heart rates
+    a_VO2max = -59.3954 +\
+        gender * (-36.3781 + 0.271 * age + 0.394 * weight + 0.404 * VO2max) +\
+        (1. - gender) * (0.274 * age + 0.103 * weight + 0.380 * VO2max)
+    b_VO2max = gender * 0.634 + (1. - gender) * 0.450
+    a_EE = gender * (-55.0969 + 0.1988 * weight + 0.2017 * age) +\
+        (1. - gender) * (-20.4022 - 0.1263 * weight + 0.074 * age)
+    b_EE = gender * 0.6309 + (1. - gender) * 0.4472
+    EE_VO2max = (a_VO2max + b_VO2max * heart_rate) * _KJ_TO_KCAL
+    EE = (a_EE + b_EE * heart_rate) * _KJ_TO_KCAL
+    return EE_VO2max, EE
 
 
 def invert_Swain(percentage_VO2max):
@@ -427,10 +437,44 @@ def anabolic_threshold_Fair(age, level):
     of the observed exertion tests described above to see how those AT results
     correspond to the formula-estimated figure.
 
-    level from 0 to 4
+    level from 0 to 3
+    """
+    if not 0 <= level < len(_ANABOLIC_ADJUST):
+        raise ValueError('level should be between 0 and 3')
+    return 180. - age + _ANABOLIC_ADJUST[level]  # in bpm
+
+
+# RER tables, built once at import
+_RQ_TAB = np.append(0.707, np.arange(0.71, 1.001, 0.01))
+_RERCAL_CHOPC = np.array([0.0, 1.1, 4.76, 8.40, 12., 15.6, 19.2, 22.3, 26.3,
+                          29.9, 33.4, 36.9, 40.3, 43.8, 47.2,
+                          50.7, 54.1, 57.5, 60.8, 64.2, 67.5, 70.8, 74.1,
+                          77.4, 80.7, 84., 87.2,
+                          90.4, 93.6, 96.8, 100.])
+_RERCAL_FATPC = 100. - _RERCAL_CHOPC
+_RERCAL = np.array([4.686, 4.690, 4.702, 4.714, 4.727, 4.739,
+                    4.751, 4.764, 4.776, 4.788, 4.801, 4.813, 4.825,
+                    4.838, 4.850, 4.862, 4.875, 4.887, 4.899, 4.911,
+                    4.924, 4.936, 4.948, 4.961, 4.973, 4.985, 4.998,
+                    5.010, 5.022, 5.035, 5.047])
+# RER() hands out these arrays, make sure they cannot be modified
+_RQ_TAB.setflags(write=False)
+_RERCAL.setflags(write=False)
+_RERCAL_FATPC.setflags(write=False)
+_RERCAL_CHOPC.setflags(write=False)
+# slopes of the first and last table segments, used to extrapolate
+_RERCAL_SLOPE_LOW = (_RERCAL[1] - _RERCAL[0]) / (_RQ_TAB[1] - _RQ_TAB[0])
+_RERCAL_SLOPE_HIGH = (_RERCAL[-1] - _RERCAL[-2]) / (_RQ_TAB[-1] - _RQ_TAB[-2])
+
+
+def _RER_caloric_equivalent(RQ):
+    """
+    Linear interpolation of the RER caloric equivalent (kcal/L) in the
+    table, extrapolated linearly outside of it
     """
-    adjustement = [-10., 0., 5., 10.]
-    return 180. - age + adjustement[level]  # in bpm
+    return np.interp(RQ, _RQ_TAB, _RERCAL) +\
+        np.minimum(RQ - _RQ_TAB[0], 0.) * _RERCAL_SLOPE_LOW +\
+        np.maximum(RQ - _RQ_TAB[-1], 0.) * _RERCAL_SLOPE_HIGH
 
 
 def RER():
@@ -439,20 +483,7 @@ def RER():
 
     Used by cal_VO2_RER
     """
-    RQ_tab = np.arange(0.71, 1.001, 0.01)
-    RQ_tab = np.append(0.707, RQ_tab)
-    RERcal_CHOpc = np.array([0.0, 1.1, 4.76, 8.40, 12., 15.6, 19.2, 22.3, 26.3,
-                             29.9, 33.4, 36.9, 40.3, 43.8, 47.2,
-                             50.7, 54.1, 57.5, 60.8, 64.2, 67.5, 70.8, 74.1,
-                             77.4, 80.7, 84., 87.2,
-                             90.4, 93.6, 96.8, 100.])
-    RERcal_Fatpc = 100. - RERcal_CHOpc
-    RERcal = np.array([4.686, 4.690, 4.702, 4.714, 4.727, 4.739,
-                       4.751, 4.764, 4.776, 4.788, 4.801, 4.813, 4.825,
-                       4.838, 4.850, 4.862, 4.875, 4.887, 4.899, 4.911,
-                       4.924, 4.936, 4.948, 4.961, 4.973, 4.985, 4.998,
-                       5.010, 5.022, 5.035, 5.047])
-    return RQ_tab, RERcal, RERcal_Fatpc, RERcal_CHOpc
+    return _RQ_TAB, _RERCAL, _RERCAL_FATPC, _RERCAL_CHOPC
 
 
 def cal_VO2_RER(VO2_input, RQ_input):
@@ -480,21 +511,25 @@ def cal_VO2_RER(VO2_input, RQ_input):
 
     Used by cal_RER
     """
-    RQ_tab, RERcal, RERcal_Fatpc, RERcal_CHOpc = RER()
-    f = interp1d(RQ_tab, RERcal, fill_value='extrapolate')
-    if isinstance(RQ_input, float):
-        RQ_input = [RQ_input]
-    if isinstance(VO2_input, float):
-        VO2_input = [VO2_input]
-    cal_min_kg = []
-    for VO2, RQ in zip(VO2_input, RQ_input):
-        VO2_L_min = VO2 * 1e-3
-        cal_min_kg.append(VO2_L_min * f(RQ))
+    VO2_L_min = np.atleast_1d(np.asarray(VO2_input, dtype=np.float64)) * 1e-3
+    RQ = np.atleast_1d(np.asarray(RQ_input, dtype=np.float64))
+    cal_min_kg = VO2_L_min * _RER_caloric_equivalent(RQ)
     # return float if there is only one value
-    if len(VO2_input) == 1:
-        return cal_min_kg[0], RERcal, RERcal_CHOpc[0], RERcal_Fatpc[0]
+    if cal_min_kg.size == 1:
+        return cal_min_kg[0], _RERCAL, _RERCAL_CHOPC[0], _RERCAL_FATPC[0]
     else:
-        return cal_min_kg, RERcal, RERcal_CHOpc, RERcal_Fatpc  # Kcal/kg/min
+        return cal_min_kg, _RERCAL, _RERCAL_CHOPC, _RERCAL_FATPC  # Kcal/kg/min
+
+
+def _frac_VO2max(percentage_HR, HRmax, HRrest):
+    """
+    Fraction of the heart rate reserve, used as the fraction of VO2max
+    """
+    return (percentage_HR * 1e-2 * HRmax - HRrest) / (HRmax - HRrest)
+
+
+def _calories_kg_from_frac(frac_VO2max, VO2max):
+    return frac_VO2max * VO2max / 3.5 / 60.
 
 
 def cal_RER(percentage_HR, HRmax, HRrest, VO2max):
@@ -518,7 +553,7 @@ def cal_RER(percentage_HR, HRmax, HRrest, VO2max):
     >>> cal_RER(percentage_HR, HRmax, HRrest, VO2max)
     0.12434179086538462
     """
-    frac_VO2max = (percentage_HR * 1e-2 * HRmax - HRrest) / (HRmax - HRrest)
+    frac_VO2max = _frac_VO2max(percentage_HR, HRmax, HRrest)
     VO2work = VO2max * frac_VO2max
     cal_min_kg, _, _, _ = cal_VO2_RER(VO2work, percentage_HR / 100.)
     return cal_min_kg
@@ -583,8 +618,8 @@ def calories_kg_HR_HRr(percentage_HR, HRmax, HRrest, VO2max):
 
     https://www.ntnu.edu/cerg
     """
-    frac_VO2max = (percentage_HR*1e-2*HRmax-HRrest)/(HRmax-HRrest)
-    Cal_min_kg = frac_VO2max * VO2max / 3.5 / 60.
+    frac_VO2max = _frac_VO2max(percentage_HR, HRmax, HRrest)
+    Cal_min_kg = _calories_kg_from_frac(frac_VO2max, VO2max)
     return Cal_min_kg
 
 
@@ -610,90 +645,11 @@ def calories_kg_HR(percentage_HR, VO2max):
 
     Kcal = VO2 (L/min) x RER caloric equivalent x time (min)
     """
-    Cal_min_kg = (percentage_HR-37.182) / 0.6463 / 100. * VO2max / 200.
+    # Swain(percentage_HR) / 100. * VO2max / 200. with the constants fused
+    Cal_min_kg = (percentage_HR-37.182) * VO2max * _CAL_KG_HR_FACTOR
     return Cal_min_kg  # per weight in kg
 
 
-def MyZone_VO2_plot(VO2max_range, HRmax, HRrest,
-                    age, weight_kg, gender, MyZoneVO2max=False):
-    """
-    Make plots using MyZone heart rate monitor formula
-
-    gender : male = 1., femal = 0.
-
-    Example
-    -------
-    >>> from calories_VO2max import *
-    >>> weight_kg = 61.5
-    >>> VO2max_range = np.arange(30.,71.,10.)
-    >>> age = 48.
-    >>> HRmax = 185.
-    >>> HRrest = 60.
-    >>> MyZone_VO2_plot(VO2max_range, HRmax, HRrest,
-    ...                 age, weight_kg, 1, MyZoneVO2max=True)
-    >>> MyZone_VO2_plot(VO2max_range, HRmax, HRrest,
-    ...                 age, weight_kg, 1, MyZoneVO2max=False)
-    >>> # ------------
-    >>> weight_kg = 50.0
-    >>> VO2max_range = np.arange(30.,61.,10.)
-    >>> MyZone_VO2_plot(VO2max_range, HRmax, HRrest,
-    ...                 age, weight_kg, 0, MyZoneVO2max=True)
-    >>> MyZone_VO2_plot(VO2max_range, HRmax, HRrest,
-    ...                 age, weight_kg, 0, MyZoneVO2max=False)
-    """
-    gender_name = ['Female', 'Male']
-    percentage_HR = np.arange(50., 101., 1.)
-    heart_rate = HRmax * percentage_HR / 100.
-    for count, V2 in enumerate(VO2max_range):
-        Cal_min = calories_kg_HR(percentage_HR, V2)
-        Cal_min2 = calories_kg_HR_HRr(percentage_HR, HRmax, HRrest, V2)
-        plt.plot(percentage_HR, Cal_min, c=colo[count],
-                 label='VO2max 1:' + str(V2), ls='-')
-        plt.plot(percentage_HR, Cal_min2, c=colo[count],
-                 label='VO2max 2:' + str(V2), ls='--')
-        EEVO2max, EE = energy_expenditure_kg(gender, age, weight_kg,
-                                             V2, heart_rate)
-        if (MyZoneVO2max):
-            Eplot = EEVO2max / weight_kg
-            label = 'FirstBeat MyZone VO2max'+str(V2)
-            plt.plot(percentage_HR, Eplot, c=colo[count],
-                     linewidth=1, ls='-.', label=label)
-    if (not MyZoneVO2max):
-        Eplot = EE / weight_kg
-        label = 'FirstBeat MyZone'
-        plt.plot(percentage_HR, Eplot,
-                 c='black', linewidth=3, ls='-.', label=label)
-    plt.title(gender_name[gender] + ' weight ' + str(weight_kg))
-    plt.xlabel('% HRmax')
-    plt.ylabel('Cal/min/kg')
-    plt.legend(frameon=False, fontsize=8)
-    plt.grid(True)
-    plt.show()
-
-    for count, V2 in enumerate(VO2max_range):
-        Cal_min = calories_kg_HR(percentage_HR, V2)
-        Cal_min2 = calories_kg_HR_HRr(percentage_HR, HRmax, HRrest, V2)
-        EEVO2max, EE = energy_expenditure_kg(gender, age, weight_kg, V2,
-                                             heart_rate)
-        if (MyZoneVO2max):
-            Eplot = EEVO2max/weight_kg
-            tit = 'MyZone VO2max ' + gender_name[gender] +\
-                  '  weight ' + str(weight_kg)
-        else:
-            Eplot = EE/weight_kg
-            tit = 'Myzone ' + gender_name[gender] + ' weight ' + str(weight_kg)
-        plt.plot(percentage_HR, Eplot/Cal_min, c=colo[count],
-                 label='VO2max 1:' + str(V2), ls='-')
-        plt.plot(percentage_HR, Eplot/Cal_min2, c=colo[count],
-                 label='VO2max 2:' + str(V2), ls='--')
-    plt.title(tit)
-    plt.xlabel('% HRmax')
-    plt.ylabel('MyZone/VO2max method')
-    plt.legend(frameon=False, fontsize=8)
-    plt.grid(True)
-    plt.show()
-
-
 def Heart_rate_reserve(HRmax, HRrest):
     """
     Compute the heart rate reserve
@@ -715,82 +671,17 @@ def aerobic_training(HRmax, HRrest):
     """
     aerobic_level1 = 50.  # to 50%
     aerobic_level2 = 75.  # to 75%
-    HRreserve = Heart_rate_reserve(HRmax, HRrest)
+    HRreserve = HRmax - HRrest  # Heart_rate_reserve
     return (HRreserve * (aerobic_level1 / 100.) + HRrest) / HRmax * 100., \
         (HRreserve * (aerobic_level2 / 100.) + HRrest) / HRmax * 100.
 
 
 def anaerobic_training(HRmax, HRrest, anaerobic_level=80.):
     # anaerobic_level = 80., up to 85% for top athtelic
-    HRreserve = Heart_rate_reserve(HRmax, HRrest)
+    HRreserve = HRmax - HRrest  # Heart_rate_reserve
     return (HRreserve * (anaerobic_level / 100.) + HRrest) / HRmax * 100.
 
 
-def energy_expenditure(percentage_HR, weight_range_kg, age, VO2max,
-                       HRmax, HRrest, gender):
-    """
-    Calculate the energy expenditure given the effort and various
-    physiological data
-
-    Inputs
-    ------
-    percentage_HR: float
-        the percentage of HRmax during the exercise
-
-    weight_range_kg: array of floats
-        weight range considered kg
-
-    age: float
-        age in years
-
-    VO2max: float
-        estimate VO2max
-
-    HRmax: float
-        maximum Heart rate in beats/min
-
-    HRrest: float
-        Heart rate beats/min at rest
-
-    gender: float
-        gender male = 1.0, female = 0.0
-
-    Returns
-    -------
-    : plot
-
-    Example
-    -------
-    >>> from calories_VO2max import *
-    >>> HRmax = 184.
-    >>> HRrest = 55.
-    >>> VO2max = 45.
-    >>> weight_range_kg = [60.,70.] # kg
-    >>> gender = 1.  # male = 1., female = 0.
-    >>> age = 48.
-    >>> percentage_HR = np.arange(50.,101.,1.)
-    >>> energy_expenditure(percentage_HR, weight_range_kg,
-    ...                    age, VO2max, HRmax, HRrest, gender)
-    """
-    heart_rate = HRmax * percentage_HR / 100.
-    for count, kg in enumerate(weight_range_kg):
-        Cal_min = calories_kg_HR_HRr(percentage_HR,
-                                     HRmax, HRrest, VO2max)*kg
-        EEVO2max, EE = energy_expenditure_kg(gender, age,
-                                             kg, VO2max, heart_rate)
-        plt.plot(percentage_HR, Cal_min,
-                 c=colo[count], label='METs ' + str(kg) + ' kg')
-        plt.plot(percentage_HR, EEVO2max,
-                 c=colo[count], ls='--', label='FirstBeat VO2max')
-        plt.plot(percentage_HR, EE, c=colo[count], ls='-.', label='Myzone')
-    plt.title('VO2max:' + str(VO2max))
-    plt.xlabel('% HR')
-    plt.ylabel('Cal/min')
-    plt.legend(frameon=False, fontsize=9)
-    plt.grid(True)
-    plt.show()
-
-
 def VO2max_from_VO2_HR(VO2exercise, HR, HRmax, HRrest):
     """
     Return an estimate of the VO2max
@@ -799,12 +690,30 @@ def VO2max_from_VO2_HR(VO2exercise, HR, HRmax, HRrest):
            HR  The Heart Rate
            HRmax The maximum Heart Rate
            HRrest The rest Heart Rate
+
+    HR (and VO2exercise) can be arrays, e.g. a heart rate recording. The
+    estimate is 0 where HR is outside [HRrest, HRmax] and nan where HR is
+    equal to HRrest.
+
+    Example
+    -------
+    >>> import numpy as np
+    >>> from calories_VO2max import *
+    >>> VO2exercise = 28.
+    >>> HRrest = 65.
+    >>> HRmax = 185.
+    >>> VO2max_from_VO2_HR(VO2exercise, 140., HRmax, HRrest)
+    44.8
+    >>> HR = np.array([50., 65., 140., 200.])
+    >>> VO2max_from_VO2_HR(VO2exercise, HR, HRmax, HRrest)
+    array([ 0. ,  nan, 44.8,  0. ])
     """
-    if ((HR > HRmax) or (HR < HRrest)):
-        return 0.
+    HR = np.asarray(HR, dtype=np.float64)
     fraction_VO2max = (HR-HRrest) / (HRmax-HRrest)
-    VO2max = VO2exercise / fraction_VO2max
-    return VO2max
+    VO2max = np.where((HR > HRmax) | (HR < HRrest), 0.,
+                      VO2exercise / np.where(fraction_VO2max == 0., np.nan,
+                                             fraction_VO2max))
+    return VO2max if VO2max.ndim else VO2max.item()
 
 
 def VO2max_from_METS(METS, HR, HRmax, HRrest):
@@ -828,43 +737,17 @@ def VO2max_from_METS(METS, HR, HRmax, HRrest):
     return VO2max
 
 
-def plot_threshold():
-    HRmax = 185.
-    HRrest = 65.
-    age = 48.
-    VO2max = VO2max_from_HR(HRmax, HRrest)
-    tit = 'HRmax=' + str(HRmax) + 'HRrest=' + str(HRrest) +\
-        'Approximate VO2max' + str(VO2max)
-    print(tit)
-    # 85. percent of the HRmax, reach 90% for top athlete
-    lactate_threshold_pcHR = 85.
-    percentage_HR = np.arange(50., 101., 1.)
-    cal1 = calories_kg_HR_HRr(percentage_HR, HRmax, HRrest,
-                              VO2max_from_HR(HRmax, HRrest))
-    cal2 = calories_kg_HR(percentage_HR, VO2max)
-    anabolic_threshold_pcHR_Fair = anabolic_threshold_Fair(age,
-                                                           1) / HRmax * 100.
-
-    aerobic_threshold_pcHR =\
-        aerobic_threshold_from_lactate(HRmax, lactate_threshold_pcHR)
-
-    cal3 = cal_RER(percentage_HR, HRmax, HRrest, VO2max)
-
-    print('Aerobic threshold:', anabolic_threshold_pcHR_Fair,
-          'Aerobic threshold pcHR:', aerobic_threshold_pcHR,
-          'Lactate threshold:', lactate_threshold_pcHR)
-    plt.plot(percentage_HR, cal1,
-             label='%HR, HRmax, HRrest, VO2max')
-    plt.plot(percentage_HR, cal2,
-             label='%HR, VO2max uses Swain et al.')
-    plt.plot(percentage_HR, cal3,
-             label='%HR, HRmax, HRrest, VO2max, anabolic threshold')
-    plt.title = tit
-    plt.xlabel('% HRmax')
-    plt.ylabel('Cal/min/kg')
-    plt.legend()
-    plt.grid(True)
-    plt.show()
+_PLOT_NAMES = ('colo', 'MyZone_VO2_plot', 'energy_expenditure',
+               'plot_threshold')
+
+
+def __getattr__(name):
+    # the plotting functions moved to calories_VO2max_plots, import it (and
+    # matplotlib) only when one of them is requested
+    if name in _PLOT_NAMES:
+        import calories_VO2max_plots
+        return getattr(calories_VO2max_plots, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # -----------------------------------------------------------------------------------
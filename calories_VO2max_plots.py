@@ -0,0 +1,237 @@
+"""
+Plots of the heart rate based calories expenditure estimates
+
+The functions of calories_VO2max are kept free of matplotlib, the figures
+are drawn here.
+
+Copyright (C) 2024  Wing-Fai Thi
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import numpy as np
+import matplotlib.pyplot as plt
+from calories_VO2max import (energy_expenditure_kg,
+                             calories_kg_HR_HRr, calories_kg_HR,
+                             VO2max_from_HR, anabolic_threshold_Fair,
+                             aerobic_threshold_from_lactate, cal_RER)
+
+colo = ('blue', 'silver', 'darkgoldenrod', 'darkgreen',
+        'darkmagenta', 'red', 'darkorange', 'gold', 'darkorchid',
+        'aqua', 'cadetblue', 'darkolivegreen', 'burlywood', 'chartreuse',
+        'chocolate', 'coral', 'cornflowerblue', 'black', 'darkkhaki', 'pink',
+        'moccasin', 'limegreen')
+
+
+def _plot_lines(x, y, colors, **kwargs):
+    """
+    Draw the columns of y in a single call, one colour per line, without
+    changing the colour cycle of the current axes
+    """
+    # an explicit color keeps the cycle from advancing
+    lines = plt.plot(x, y, color=colors[0], **kwargs)
+    for line, c in zip(lines, colors):
+        line.set_color(c)
+    return lines
+
+
+def MyZone_VO2_plot(VO2max_range, HRmax, HRrest,
+                    age, weight_kg, gender, MyZoneVO2max=False):
+    """
+    Make plots using MyZone heart rate monitor formula
+
+    gender : male = 1., femal = 0.
+
+    Example
+    -------
+    >>> from calories_VO2max_plots import *
+    >>> weight_kg = 61.5
+    >>> VO2max_range = np.arange(30.,71.,10.)
+    >>> age = 48.
+    >>> HRmax = 185.
+    >>> HRrest = 60.
+    >>> MyZone_VO2_plot(VO2max_range, HRmax, HRrest,
+    ...                 age, weight_kg, 1, MyZoneVO2max=True)
+    >>> MyZone_VO2_plot(VO2max_range, HRmax, HRrest,
+    ...                 age, weight_kg, 1, MyZoneVO2max=False)
+    >>> # ------------
+    >>> weight_kg = 50.0
+    >>> VO2max_range = np.arange(30.,61.,10.)
+    >>> MyZone_VO2_plot(VO2max_range, HRmax, HRrest,
+    ...                 age, weight_kg, 0, MyZoneVO2max=True)
+    >>> MyZone_VO2_plot(VO2max_range, HRmax, HRrest,
+    ...                 age, weight_kg, 0, MyZoneVO2max=False)
+    """
+    gender_name = ['Female', 'Male']
+    percentage_HR = np.arange(50., 101., 1.)
+    heart_rate = HRmax * percentage_HR / 100.
+    # the curves are computed once on the (VO2max, heart rate) grid, kept
+    # for the ratio plot, and each set of curves is drawn in a single call
+    VO2max_col = np.asarray(VO2max_range, dtype=np.float64)[:, None]
+    Cal_min = calories_kg_HR(percentage_HR, VO2max_col)
+    Cal_min2 = calories_kg_HR_HRr(percentage_HR, HRmax, HRrest, VO2max_col)
+    EEVO2max, EE = energy_expenditure_kg(gender, age, weight_kg,
+                                         VO2max_col, heart_rate)
+    EE = np.broadcast_to(EE, Cal_min.shape)  # MyZone formula ignores VO2max
+    colors = colo[:len(VO2max_range)]
+    labels1 = ['VO2max 1:' + str(V2) for V2 in VO2max_range]
+    labels2 = ['VO2max 2:' + str(V2) for V2 in VO2max_range]
+    _plot_lines(percentage_HR, Cal_min.T, colors, label=labels1, ls='-')
+    _plot_lines(percentage_HR, Cal_min2.T, colors, label=labels2, ls='--')
+    if (MyZoneVO2max):
+        Eplot = EEVO2max / weight_kg
+        labels = ['FirstBeat MyZone VO2max'+str(V2) for V2 in VO2max_range]
+        _plot_lines(percentage_HR, Eplot.T, colors, linewidth=1, ls='-.',
+                    label=labels)
+    if (not MyZoneVO2max):
+        Eplot = EE[-1] / weight_kg
+        label = 'FirstBeat MyZone'
+        plt.plot(percentage_HR, Eplot,
+                 c='black', linewidth=3, ls='-.', label=label)
+    plt.title(gender_name[gender] + ' weight ' + str(weight_kg))
+    plt.xlabel('% HRmax')
+    plt.ylabel('Cal/min/kg')
+    plt.legend(frameon=False, fontsize=8)
+    plt.grid(True)
+    plt.show()
+
+    if (MyZoneVO2max):
+        Eplot = EEVO2max / weight_kg
+        tit = 'MyZone VO2max ' + gender_name[gender] +\
+              '  weight ' + str(weight_kg)
+    else:
+        Eplot = EE / weight_kg
+        tit = 'Myzone ' + gender_name[gender] + ' weight ' + str(weight_kg)
+    _plot_lines(percentage_HR, (Eplot/Cal_min).T, colors,
+                label=labels1, ls='-')
+    _plot_lines(percentage_HR, (Eplot/Cal_min2).T, colors,
+                label=labels2, ls='--')
+    plt.title(tit)
+    plt.xlabel('% HRmax')
+    plt.ylabel('MyZone/VO2max method')
+    plt.legend(frameon=False, fontsize=8)
+    plt.grid(True)
+    plt.show()
+
+
+def energy_expenditure(percentage_HR, weight_range_kg, age, VO2max,
+                       HRmax, HRrest, gender):
+    """
+    Calculate the energy expenditure given the effort and various
+    physiological data
+
+    Inputs
+    ------
+    percentage_HR: float
+        the percentage of HRmax during the exercise
+
+    weight_range_kg: array of floats
+        weight range considered kg
+
+    age: float
+        age in years
+
+    VO2max: float
+        estimate VO2max
+
+    HRmax: float
+        maximum Heart rate in beats/min
+
+    HRrest: float
+        Heart rate beats/min at rest
+
+    gender: float
+        gender male = 1.0, female = 0.0
+
+    Returns
+    -------
+    : plot
+
+    Example
+    -------
+    >>> from calories_VO2max_plots import *
+    >>> HRmax = 184.
+    >>> HRrest = 55.
+    >>> VO2max = 45.
+    >>> weight_range_kg = [60.,70.] # kg
+    >>> gender = 1.  # male = 1., female = 0.
+    >>> age = 48.
+    >>> percentage_HR = np.arange(50.,101.,1.)
+    >>> energy_expenditure(percentage_HR, weight_range_kg,
+    ...                    age, VO2max, HRmax, HRrest, gender)
+    """
+    heart_rate = HRmax * percentage_HR / 100.
+    # energy_expenditure_kg broadcasts over the (weight, heart rate) grid
+    EEVO2max, EE = energy_expenditure_kg(gender, age,
+                                         np.asarray(weight_range_kg)[:, None],
+                                         VO2max, heart_rate)
+    Cal_min_kg = calories_kg_HR_HRr(percentage_HR, HRmax, HRrest, VO2max)
+    Cal_min = Cal_min_kg * np.asarray(weight_range_kg)[:, None]
+    colors = colo[:len(weight_range_kg)]
+    _plot_lines(percentage_HR, Cal_min.T, colors,
+                label=['METs ' + str(kg) + ' kg' for kg in weight_range_kg])
+    _plot_lines(percentage_HR, EEVO2max.T, colors, ls='--',
+                label=['FirstBeat VO2max'] * len(weight_range_kg))
+    _plot_lines(percentage_HR, EE.T, colors, ls='-.',
+                label=['Myzone'] * len(weight_range_kg))
+    plt.title('VO2max:' + str(VO2max))
+    plt.xlabel('% HR')
+    plt.ylabel('Cal/min')
+    plt.legend(frameon=False, fontsize=9)
+    plt.grid(True)
+    plt.show()
+
+
+def plot_threshold():
+    HRmax = 185.
+    HRrest = 65.
+    age = 48.
+    VO2max = VO2max_from_HR(HRmax, HRrest)
+    tit = 'HRmax=' + str(HRmax) + 'HRrest=' + str(HRrest) +\
+        'Approximate VO2max' + str(VO2max)
+    print(tit)
+    # 85. percent of the HRmax, reach 90% for top athlete
+    lactate_threshold_pcHR = 85.
+    percentage_HR = np.arange(50., 101., 1.)
+    cal1 = calories_kg_HR_HRr(percentage_HR, HRmax, HRrest, VO2max)
+    cal2 = calories_kg_HR(percentage_HR, VO2max)
+    anabolic_threshold_pcHR_Fair = anabolic_threshold_Fair(age,
+                                                           1) / HRmax * 100.
+
+    aerobic_threshold_pcHR =\
+        aerobic_threshold_from_lactate(HRmax, lactate_threshold_pcHR)
+
+    cal3 = cal_RER(percentage_HR, HRmax, HRrest, VO2max)
+
+    print('Aerobic threshold:', anabolic_threshold_pcHR_Fair,
+          'Aerobic threshold pcHR:', aerobic_threshold_pcHR,
+          'Lactate threshold:', lactate_threshold_pcHR)
+    plt.plot(percentage_HR, cal1,
+             label='%HR, HRmax, HRrest, VO2max')
+    plt.plot(percentage_HR, cal2,
+             label='%HR, VO2max uses Swain et al.')
+    plt.plot(percentage_HR, cal3,
+             label='%HR, HRmax, HRrest, VO2max, anabolic threshold')
+    plt.title = tit
+    plt.xlabel('% HRmax')
+    plt.ylabel('Cal/min/kg')
+    plt.legend()
+    plt.grid(True)
+    plt.show()
+
+
+# -----------------------------------------------------------------------------------
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod(verbose=True, optionflags=doctest.ELLIPSIS)
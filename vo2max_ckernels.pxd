@@ -0,0 +1,6 @@
+cpdef double vo2max_by(double weight_kg, double time_min, double HR,
+                       int gender) noexcept nogil
+cpdef double vo2max_rockport(double age, double weight_kg, double time_min,
+                             double HR, int gender) noexcept nogil
+cpdef double vo2max_submaximal(double incl, double speed, double weight,
+                               double HR, double age) noexcept nogil
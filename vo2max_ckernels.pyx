@@ -0,0 +1,48 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+# distutils: extra_compile_args = -O3 -ffast-math -march=native
+"""
+Scalar C-level versions of the VO2max formulas
+
+For native callers and other Cython modules (cimport vo2max_ckernels).
+The functions release the GIL so they can be used inside prange loops.
+Build in place with
+
+    cythonize -i vo2max_ckernels.pyx
+
+Copyright (C) 2024  Wing-Fai Thi
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+cpdef double vo2max_by(double weight_kg, double time_min, double HR,
+                       int gender) noexcept nogil:
+    """Brigham Young University jog test, gender: woman = 0, man = 1"""
+    return 100.5 + 8.344 * gender -\
+        ((0.1636 * weight_kg) + (1.438 * time_min) + (0.1928 * HR))
+
+
+cpdef double vo2max_rockport(double age, double weight_kg, double time_min,
+                             double HR, int gender) noexcept nogil:
+    """Rockport walk test, gender: woman = 0, man = 1"""
+    return 132.853 + 6.315 * gender -\
+        (0.0769 / 2.2 * weight_kg) - (0.3877 * age) -\
+        (3.2648 * time_min) - (0.156 * HR)
+
+
+cpdef double vo2max_submaximal(double incl, double speed, double weight,
+                               double HR, double age) noexcept nogil:
+    """NTNU submaximal treadmill test"""
+    return 35.25 + 1.276 * incl + 6.402 * speed - 0.196 * weight -\
+        27.65 * HR / (215.336 - 0.73 * age)